@@ -10,19 +10,15 @@ from math import pi
 import numpy as np
 
 # local imports
-from .auxiliary import GetRandom, distribute
-from .cosmology import H, dL
+from .auxiliary import GetRandom, distribute, dL_array, H_array, check_redshifts, evaluate_unique, catalog
+from .context import Context
 
 
-# coalescence rate
+# coalescence rate, for a redshift or an array of redshifts
 # required for the normalized redshift distribution function
 def r(z):
-    if z < 0 or z > 5:
-        return 0
-    elif z <= 1:
-        return (1+2*z)
-    elif 1 < z <= 5:
-        return (15 - 3*z)/4
+    z = np.asarray(z, dtype=float)
+    return np.where((z < 0) | (z > 5), 0, np.where(z <= 1, 1+2*z, (15 - 3*z)/4))
 
 # return the normalized redshift distribution function for the BNS events
 # from arXiv:1805.08731, page 13
@@ -34,11 +30,12 @@ def dist(dL, H, r):
     # normalizing constant
     N = (quad(lambda Z: (4*pi*r(Z)*(dL(Z, H))**2) / (H(Z)*(1+Z)**3), zmin, zmax)[0])**(-1)
 
-    # redshift distribution function
+    # redshift distribution function, for a redshift or an array of redshifts
     def f(z):
-        if z < zmin or z > zmax:
-            return 0
-        return (4*pi*N*r(z)*(dL(z, H))**2) / (H(z)*(1+z)**3)
+        z = np.asarray(z, dtype=float)
+        inside = (z >= zmin) & (z <= zmax)
+        z = np.where(inside, z, zmin)
+        return np.where(inside, (4*pi*N*r(z)*(dL_array(z, H, dL))**2) / (H_array(z, H)*(1+z)**3), 0)
 
     # get the minimum and the maximum of the distribution
     dmax = fmin(lambda Z: -f(Z), 1.5, disp=False)[0]*1.05
@@ -47,61 +44,63 @@ def dist(dL, H, r):
     return (f, zmin, zmax, dmin, dmax)
 
 
-# errors for the luminosity distance
+# errors for the luminosity distance, for a redshift or an array of redshifts
 # from arXiv:1805.08731, page 13
 def error(z, dL, H):
-    return dL(z, H) * ( (0.1449*z - 0.0118*z**2 + 0.0012*z**3)**2 + (0.05*z)**2 )**(0.5)
+    return dL_array(z, H, dL) * ( (0.1449*z - 0.0118*z**2 + 0.0012*z**3)**2 + (0.05*z)**2 )**(0.5)
 
 
 # generate the forecast ET events
-def generate(events=0, redshifts=[], ideal=False):
+# redshifts can be a list or a NumPy array, in which case NumPy arrays are returned
+def generate(events=0, redshifts=[], ideal=False, context=None):
     # specify either events or redshifts
-    if bool(events) + bool(redshifts) != 1:
+    if bool(events) + (len(redshifts) > 0) != 1:
         raise Exception("Specify either the number of events or their redshifts")
 
+    # get the cosmological model and random number generators, defaults to a new context
+    context = context if context else Context()
+    H, dL = context.H, context.dL
+
     # get redshift distribution function
     f, zmin, zmax, dmin, dmax = dist(dL, H, r)
 
     # get luminosity distance and error for specific redshifts
-    if redshifts:
+    if len(redshifts) > 0:
         # protect against out of bound redshifts
-        if min(redshifts) < zmin or max(redshifts) > zmax:
-            raise Exception(f"Redshift limits are out of bounds. Lowest and highest redshift for the ET are z={zmin} and z={zmax} correspondingly")
+        z = np.asarray(redshifts, dtype=float)
+        check_redshifts(z, zmin, zmax, "the ET")
 
-        distances = [dL(z, H) for z in redshifts]
-        errors = [error(z, dL, H) for z in redshifts]
+        distances, errors = evaluate_unique([lambda Z: dL_array(Z, H, dL), lambda Z: error(Z, dL, H)], z)
 
     # generate events according to the redshift distribution
     else:
         # get the redshifts for the events
-        redshifts = GetRandom(f, zmin, zmax, dmin, dmax, N=events)
+        redshifts = GetRandom(f, zmin, zmax, dmin, dmax, context.sampling, N=events)
 
         # get luminosity distance and the error for each event
-        distances = [dL(z, H) for z in redshifts]
-        errors = [error(z, dL, H) for z in redshifts]
+        distances = dL_array(np.array(redshifts), H, dL)
+        errors = error(np.array(redshifts), dL, H)
 
     # distribute the events around the most likely value using a gaussian distribution
     if not ideal:
-        distances, errors = distribute(distances, errors)
+        distances, errors = distribute(distances, errors, context.scatter)
 
-    return redshifts, distances, errors
+    return catalog(redshifts, redshifts, distances, errors)
 
 
 # plot the BNS redshift distribution
-def plot_dist(output=None):
-    # redshift boundaries (same as above)
-    zmin = 0.07
-    zmax = 2
-    line = np.linspace(zmin, zmax, 1000)
+def plot_dist(output=None, context=None):
+    # get the cosmological model, defaults to a new context
+    context = context if context else Context()
+    H, dL = context.H, context.dL
 
-    # get redshift distribution
+    # get redshift distribution and boundaries
     f, zmin, zmax, dmin, dmax = dist(dL, H, r)
+    line = np.linspace(zmin, zmax, 1000)
 
     # obtain distribution considering N = 1000 event normalization
     events = 1000
-    distribution = []
-    for z in line:
-        distribution.append(events*f(z))
+    distribution = events*f(line)
 
     # print distribution area, should match number of dummie events
     print(f"Total number of events considered to plot the distribution = {events}")
@@ -118,6 +117,7 @@ def plot_dist(output=None):
     # output or show
     if output:
         plt.savefig(output, transparent=True)
+        plt.close()
     else:
         plt.show()
 
@@ -125,7 +125,11 @@ def plot_dist(output=None):
 
 
 # plot the error as a function of redshift
-def plot_error(output=None):
+def plot_error(output=None, context=None):
+    # get the cosmological model, defaults to a new context
+    context = context if context else Context()
+    H, dL = context.H, context.dL
+
     # get redshift boundaries
     f, zmin, zmax, dmin, dmax = dist(dL, H, r)
 
@@ -133,7 +137,7 @@ def plot_error(output=None):
     line = np.linspace(zmin, zmax, 1000)
 
     # get errors
-    errors = [error(z, dL, H) for z in line]
+    errors = error(line, dL, H)
 
     # plot and show
     plt.plot(line, errors)
@@ -144,6 +148,7 @@ def plot_error(output=None):
     # output or show
     if output:
         plt.savefig(output, transparent=True)
+        plt.close()
     else:
         plt.show()
 
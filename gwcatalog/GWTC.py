@@ -3,16 +3,19 @@
 
 
 # imports
-from scipy.misc import derivative
-from random import gauss
 import pandas
 
 # local imports
-from .cosmology import H, dL
+from .auxiliary import dL_derivative
+from .context import Context
 
 
 # generate GWTC events
-def generate():
+def generate(context=None):
+    # get the cosmological model, defaults to a new context
+    context = context if context else Context()
+    H, dL = context.H, context.dL
+
     # get raw data from the GWTC file
     with open(__file__.replace("GWTC.py", "") + "data/GWTC.csv", "r") as file:
         columns = pandas.read_csv(file, comment="#")
@@ -42,9 +45,10 @@ def generate():
         rederrors.append(rederror)
 
     # propagate the redshift error to the luminosity distance
+    derivatives = dL_derivative(redshifts, H, dL)
     errors = []
     for i in range(0, len(redshifts_mid)):
-        propagatedredshifterror = derivative(dL, redshifts[i], dx=1e-6, args=(H,)) * rederrors[i]
-        errors.append((disterrors[i]**2 + propagatedredshifterror**2)**0.5)
+        propagatedredshifterror = derivatives[i] * rederrors[i]
+        errors.append(float((disterrors[i]**2 + propagatedredshifterror**2)**0.5))
 
     return redshifts, distances, errors
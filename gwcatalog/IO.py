@@ -3,12 +3,15 @@
 
 
 # imports
+import numpy as np
 import pandas
+import json
 import sys
 
 
 # export catalog to file
-def save(redshifts, distances, errors, filename, info=""):
+# the optional metadata, a dictionary, is stored in the header and allows the catalog to be extended later
+def save(redshifts, distances, errors, filename, info="", metadata=None):
     # output to file or stdout
     if filename != sys.stdout:
         file = open(filename, "w")
@@ -18,12 +21,18 @@ def save(redshifts, distances, errors, filename, info=""):
     # header
     if info:
         file.write(info + "\n")
+    if metadata:
+        file.write(f"# metadata: {json.dumps(metadata)}\n")
     file.write("# units: none, Gpc, Gpc\n")
 
     # body
     file.write("redshift,luminosity_distance,error\n")
-    for i in range(0, len(redshifts)):
-        file.write(f"{redshifts[i]},{distances[i]},{errors[i]}\n")
+    for redshift, distance, error in zip(np.asarray(redshifts).tolist(), np.asarray(distances).tolist(), np.asarray(errors).tolist()):
+        file.write(f"{redshift},{distance},{error}\n")
+
+    # close the file, leaving stdout open
+    if filename != sys.stdout:
+        file.close()
 
     pass
 
@@ -31,9 +40,54 @@ def save(redshifts, distances, errors, filename, info=""):
 # import catalog from file
 def load(filename):
     with open(filename, "r") as file:
-        columns = pandas.read_csv(file, comment="#")
+        columns = pandas.read_csv(file, comment="#", float_precision="round_trip")
         redshifts = columns["redshift"].tolist()
         distances = columns["luminosity_distance"].tolist()
         errors = columns["error"].tolist()
 
     return redshifts, distances, errors
+
+
+# import the metadata stored in the header of a catalog, None if there is none
+def load_metadata(filename):
+    with open(filename, "r") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            if not line.startswith("#"):
+                break
+            if line.startswith("# metadata: "):
+                return json.loads(line[len("# metadata: "):])
+
+    return None
+
+
+# import a list of redshifts from a text file (one redshift per line) or from a column of a .csv, .npy or .parquet file
+# .csv and .parquet files have a header, and default to their first column
+# .npy files are memory mapped, so that very long lists are not read into memory at once
+def load_redshifts(filename, column=None):
+    if filename.endswith(".npy"):
+        # protection against a column that would be ignored
+        if column:
+            raise Exception(f"{filename} is a NumPy array without named columns, remove the column to read it")
+
+        redshifts = np.load(filename, mmap_mode="r")
+
+    # requires pyarrow or fastparquet, optional dependencies of pandas
+    elif filename.endswith(".parquet"):
+        columns = pandas.read_parquet(filename, columns=[column] if column else None)
+        redshifts = columns[column] if column else columns.iloc[:, 0]
+
+    elif filename.endswith(".csv") or column:
+        columns = pandas.read_csv(filename, comment="#", usecols=[column] if column else None)
+        redshifts = columns[column] if column else columns.iloc[:, 0]
+
+    else:
+        redshifts = pandas.read_csv(filename, comment="#", header=None, usecols=[0])[0]
+
+    # protection against multidimensional arrays
+    redshifts = np.asarray(redshifts, dtype=float)
+    if redshifts.ndim != 1:
+        raise Exception(f"The redshifts in {filename} must be a one dimensional array")
+
+    return redshifts
@@ -4,13 +4,12 @@
 
 # imports
 from scipy.interpolate import CubicSpline
-from scipy.misc import derivative
 import matplotlib.pyplot as plt
 import numpy as np
 
 # local imports
-from .auxiliary import GetRandom, distribute, dL_to_redshift
-from .cosmology import dL, H
+from .auxiliary import GetRandom, distribute, dL_to_redshift, dL_array, dL_derivative, check_redshifts, evaluate_unique, catalog
+from .context import Context
 
 
 # non-normalized luminosity distance probability distribution (in Gpc)
@@ -33,10 +32,10 @@ def dLdist():
     return (f, dLmin, dLmax, dmin, dmax)
 
 
-# errors for the luminosity distance
+# errors for the luminosity distance, for a redshift or an array of redshifts
 # from arXiv:2007.13791
 def dLerror(z, dL, H):
-    return 0.5625*dL(z, H)**2
+    return 0.5625*dL_array(z, H, dL)**2
 
 def zerror(z):
     return 0.005*(1+z)
@@ -49,7 +48,7 @@ def error(z, dL, H):
     redshifterror = zerror(z)
 
     # propagate the redshift error to the luminosity distance
-    propagatedredshifterror = derivative(dL, z, dx=1e-6, args=(H,)) * redshifterror
+    propagatedredshifterror = dL_derivative(z, H, dL) * redshifterror
 
     # get total error
     error = (distanceerror**2 + propagatedredshifterror**2)**0.5
@@ -58,51 +57,56 @@ def error(z, dL, H):
 
 
 # generate the forecast LIGO events
-def generate(events=0, redshifts=[], ideal=False):
+# redshifts can be a list or a NumPy array, in which case NumPy arrays are returned
+def generate(events=0, redshifts=[], ideal=False, context=None):
     # specify either events or redshifts
-    if bool(events) + bool(redshifts) != 1:
+    if bool(events) + (len(redshifts) > 0) != 1:
         raise Exception("Specify either the number of events or their redshifts")
 
+    # get the cosmological model and random number generators, defaults to a new context
+    context = context if context else Context()
+    H, dL = context.H, context.dL
+
     # get luminosity distance distribution function
     f, dLmin, dLmax, dmin, dmax = dLdist()
 
     # get luminosity distance and error for specific redshifts
-    if redshifts:
+    if len(redshifts) > 0:
         # compute valid redshift limits
-        zmin = dL_to_redshift(dLmin)
-        zmax = dL_to_redshift(dLmax)
+        zmin = dL_to_redshift(dLmin, H, dL)
+        zmax = dL_to_redshift(dLmax, H, dL)
 
         # protect against out of bound redshifts
-        if min(redshifts) < zmin or max(redshifts) > zmax:
-            raise Exception(f"Redshift limits are out of bounds. Lowest and highest redshift for LIGO are z={zmin} and z={zmax} correspondingly")
+        z = np.asarray(redshifts, dtype=float)
+        check_redshifts(z, zmin, zmax, "LIGO")
 
-        distances = [dL(z, H) for z in redshifts]
-        errors = [error(z, dL, H) for z in redshifts]
+        distances, errors = evaluate_unique([lambda Z: dL_array(Z, H, dL), lambda Z: error(Z, dL, H)], z)
 
     # generate events according to the redshift distribution
     else:
-        distances = GetRandom(f, dLmin, dLmax, dmin, dmax, N=events)
+        distances = GetRandom(f, dLmin, dLmax, dmin, dmax, context.sampling, N=events)
 
         # get the corresponding redshift for each luminosity distance
-        redshifts = [dL_to_redshift(i) for i in distances]
+        redshifts = dL_to_redshift(np.array(distances), H, dL).tolist()
 
         # get the error for each event
-        errors = [error(z, dL, H) for z in redshifts]
+        errors = error(np.array(redshifts), dL, H)
 
     # distribute the events around the most likely value using a gaussian distribution
     if not ideal:
-        distances, errors = distribute(distances, errors)
+        distances, errors = distribute(distances, errors, context.scatter)
 
-    return redshifts, distances, errors
+    return catalog(redshifts, redshifts, distances, errors)
 
 
 # plot the luminosity distance distribution
 def plot_dist(output=None):
-    # get luminosity distances distribution
-    distances, probabilities = dLdist()
+    # get luminosity distances distribution and draw a line within its limits
+    f, dLmin, dLmax, dmin, dmax = dLdist()
+    line = np.linspace(dLmin, dLmax, 1000)
 
     # plot and show
-    plt.plot(distances, probabilities)
+    plt.plot(line, f(line))
     plt.title("Replicating figure 2 of arXiv:1901.03321")
     plt.gca().axes.yaxis.set_ticklabels([])  # somehow removes ticks without removing grid
     plt.grid()
@@ -112,30 +116,37 @@ def plot_dist(output=None):
     # output or show
     if output:
         plt.savefig(output, transparent=True)
+        plt.close()
     else:
         plt.show()
 
     return
 
 
-# plot the error as a function of redshift  FIX-ME
-def plot_error(output=None):
+# plot the error as a function of redshift
+def plot_error(output=None, context=None):
+    # get the cosmological model, defaults to a new context
+    context = context if context else Context()
+    H, dL = context.H, context.dL
+
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
 
-    # get redshift boundaries
-    f, zmin, zmax, dmin, dmax = dist()
+    # get redshift boundaries from the luminosity distance boundaries
+    f, dLmin, dLmax, dmin, dmax = dLdist()
+    zmin = dL_to_redshift(dLmin, H, dL)
+    zmax = dL_to_redshift(dLmax, H, dL)
 
     # draw a line for the redshifts
     redshifts = np.linspace(zmin, zmax, 1000)
 
     # get luminosity distances
-    distances = [dL(z, H) for z in redshifts]
+    distances = dL_array(redshifts, H, dL)
 
     # get total error
-    errors = [error(z, dL, H) for z in redshifts]
+    errors = error(redshifts, dL, H)
 
     # get the luminosity distance error
-    dLerrors = [dLerror(z, dL, H) for z in redshifts]
+    dLerrors = dLerror(redshifts, dL, H)
 
     # plot luminosity distance error
     ax1.plot(distances, dLerrors, label="$\sigma_{d_L}(d_L)$")
@@ -146,7 +157,7 @@ def plot_error(output=None):
     ax1.legend()
 
     # get error for redshift
-    zerrors = [zerror(z) for z in redshifts]
+    zerrors = zerror(redshifts)
 
     # plot redshift error
     ax2.plot(redshifts, zerrors, label="error")
@@ -158,6 +169,7 @@ def plot_error(output=None):
     # output or show
     if output:
         plt.savefig(output, transparent=True)
+        plt.close()
     else:
         plt.show()
 
@@ -3,14 +3,13 @@
 
 
 # imports
-from math import pi, sqrt, atan, floor
-from scipy.misc import derivative
 import matplotlib.pyplot as plt
+from math import pi
 import numpy as np
 
 # local imports
-from .auxiliary import GetRandom, dL_line, distribute
-from .cosmology import H, dL
+from .auxiliary import GetRandom, dL_line, distribute, dL_array, dL_derivative, H_array, check_redshifts, evaluate_unique, catalog
+from .context import Context
 
 
 # redshift distribution of the MBHB events for the L6A2M5N2 LISA mission over 5 years
@@ -41,45 +40,47 @@ def dist(population):
     dmin = min(dist)
     dmax = max(dist)
 
-    # define our redshift distribution function
+    # define our redshift distribution function, for a redshift or an array of redshifts
     def f(z):
-        if z < 0.1 or z >= 9:
-            return 0
-        return dist[floor(z)]
+        z = np.asarray(z, dtype=float)
+        bins = np.clip(np.floor(z), 0, 8).astype(int)
+        return np.where((z < 0.1) | (z >= 9), 0, np.take(dist, bins))
 
     return (f, zmin, zmax, dmin, dmax, N)
 
 
-# errors for the luminosity distance
+# errors for the luminosity distance, for a redshift or an array of redshifts
+# each component takes the luminosity distance at z, so that it is only computed once
 # from arXiv:2010.09049, page 6
-def sigma_lens(z, dL, H):
-    return 0.066 * ((1-(1+z)**(-0.25))/0.25)**(1.8) * dL(z, H)
+def sigma_lens(z, distance):
+    return 0.066 * ((1-(1+z)**(-0.25))/0.25)**(1.8) * distance
 
 def F_delens(z):
-    return 1 - 2*0.3/pi * atan(z/0.073)
+    return 1 - 2*0.3/pi * np.arctan(z/0.073)
 
-def sigma_delens(z, dL, H):
-    return sigma_lens(z, dL, H) * F_delens(z)
+def sigma_delens(z, distance):
+    return sigma_lens(z, distance) * F_delens(z)
 
-def sigma_v(z, dL, H):
+def sigma_v(z, distance, H):
     rms = 1.6203896*10**(-20)   # [Gpc/s]
     c = 9.7156118908*10**(-18)  # speed of light [Gpc/s]
-    return ( ( 1 + (c*(1+z)**2)/(H(z)*dL(z, H)) ) * rms/c ) * dL(z, H)
+    return ( ( 1 + (c*(1+z)**2)/(H_array(z, H)*distance) ) * rms/c ) * distance
 
-def sigma_LISA(z, dL, H):
-    return 0.05 * (dL(z, H)**2)/36.6
+def sigma_LISA(distance):
+    return 0.05 * (distance**2)/36.6
 
 def sigma_photo(z):
-    if z < 2:
-        return 0
-    return 0.03*(1+z)
+    return np.where(np.asarray(z) < 2, 0, 0.03*(1+np.asarray(z)))
 
 def error(z, dL, H):
-    return sqrt(sigma_delens(z, dL, H)**2 + sigma_v(z, dL, H)**2 + sigma_LISA(z, dL, H)**2 + (derivative(dL, z, dx=1e-6, args=(H,)) * sigma_photo(z))**2)
+    distance = dL_array(z, H, dL)
+    total = np.sqrt(sigma_delens(z, distance)**2 + sigma_v(z, distance, H)**2 + sigma_LISA(distance)**2 + (dL_derivative(z, H, dL) * sigma_photo(z))**2)
+    return float(total) if np.ndim(total) == 0 else total
 
 
 # generate the forecast LISA events
-def generate(population=None, events=0, years=0, redshifts=[], ideal=False):
+# redshifts can be a list or a NumPy array, in which case NumPy arrays are returned
+def generate(population=None, events=0, years=0, redshifts=[], ideal=False, context=None):
     # protection against none or invalid population
     if not population:
         raise Exception("The population of MBHB must be provided, available populations are: 'Pop III', 'Delay' and 'No Delay'")
@@ -87,20 +88,23 @@ def generate(population=None, events=0, years=0, redshifts=[], ideal=False):
         raise Exception("Population not available, available populations are: 'Pop III', 'Delay' and 'No Delay'")
 
     # specify either events, years or redshifts
-    if bool(events) + bool(years) + bool(redshifts) != 1:
+    if bool(events) + bool(years) + (len(redshifts) > 0) != 1:
         raise Exception("Specify either the number of events, years or redshifts")
 
+    # get the cosmological model and random number generators, defaults to a new context
+    context = context if context else Context()
+    H, dL = context.H, context.dL
+
     # get the redshift distribution function, minimums/maximums and number of events for that distribution
     f, zmin, zmax, dmin, dmax, N = dist(population)
 
     # get luminosity distance and error for specific redshifts
-    if redshifts:
+    if len(redshifts) > 0:
         # protect against out of bound redshifts
-        if min(redshifts) < zmin or max(redshifts) > zmax:
-            raise Exception(f"Redshift limits are out of bounds. Lowest and highest redshift for LISA are z={zmin} and z={zmax} correspondingly")
+        z = np.asarray(redshifts, dtype=float)
+        check_redshifts(z, zmin, zmax, "LISA")
 
-        distances = [dL(z, H) for z in redshifts]
-        errors = [error(z, dL, H) for z in redshifts]
+        distances, errors = evaluate_unique([lambda Z: dL_array(Z, H, dL), lambda Z: error(Z, dL, H)], z)
 
     # generate events according to the redshift distribution
     else:
@@ -110,15 +114,15 @@ def generate(population=None, events=0, years=0, redshifts=[], ideal=False):
             N = int(N * years/5)
 
         # get redshifts and the distance and error for each event
-        redshifts = GetRandom(f, zmin, zmax, dmin, dmax, N=N)
-        distances = [dL(z, H) for z in redshifts]
-        errors = [error(z, dL, H) for z in redshifts]
+        redshifts = GetRandom(f, zmin, zmax, dmin, dmax, context.sampling, N=N)
+        distances = dL_array(np.array(redshifts), H, dL)
+        errors = error(np.array(redshifts), dL, H)
 
     # distribute the events around the most likely value using a gaussian distribution
     if not ideal:
-        distances, errors = distribute(distances, errors)
+        distances, errors = distribute(distances, errors, context.scatter)
 
-    return redshifts, distances, errors
+    return catalog(redshifts, redshifts, distances, errors)
 
 
 # plot all MBHB redshift distributions
@@ -130,9 +134,9 @@ def plot_dist(output=None):
     for population, color in zip(populations, colors):
         f, z_min, z_max, min, max, N = dist(population)
 
-        line = np.linspace(z_min, z_max, 1000).tolist()
+        line = np.linspace(z_min, z_max, 1000)
 
-        events = [f(i) for i in line]
+        events = f(line)
 
         print(f"Sum of all events for population {population} in 5 years is {N}")
 
@@ -148,6 +152,7 @@ def plot_dist(output=None):
     # output or show
     if output:
         plt.savefig(output, transparent=True)
+        plt.close()
     else:
         plt.show()
 
@@ -156,36 +161,33 @@ def plot_dist(output=None):
 
 # plot the error as a function of redshift
 # reproduces figure 3 from arXiv:2010.09049
-def plot_error(output=None):
+def plot_error(output=None, context=None):
+    # get the cosmological model, defaults to a new context
+    context = context if context else Context()
+    H, dL = context.H, context.dL
+
     # get luminosity distance theoretical line
-    line, distances = dL_line(0, 10)
+    line, distances = dL_line(0, 10, H, dL)
 
     # start from redshift z = 0.1
-    distances = distances[10:]
+    distances = np.array(distances[10:])
     line = line[10:]
 
-    # generate lists for all sources of error
-    total = []
-    photo = []
-    LISA = []
-    v = []
-    lens = []
-    delens = []
-    for i in line:
-        total.append(error(i, dL, H))
-        photo.append(sigma_photo(i))
-        LISA.append(sigma_LISA(i, dL, H))
-        v.append(sigma_v(i, dL, H))
-        lens.append(sigma_lens(i, dL, H))
-        delens.append(sigma_delens(i, dL, H))
+    # compute all sources of error at once
+    total = error(line, dL, H)
+    photo = sigma_photo(line)
+    LISA = sigma_LISA(distances)
+    v = sigma_v(line, distances, H)
+    lens = sigma_lens(line, distances)
+    delens = sigma_delens(line, distances)
 
     # plot all errors divided by the theoretical luminosity distance
-    plt.plot(line, [i/j for i, j in zip(total, distances)], linestyle="dashed", color="black" ,label="$\sigma/d_L$")
-    plt.plot(line, [i/j for i, j in zip(photo, distances)], color="green", label="$\sigma_{photo}/d_L$")
-    plt.plot(line, [i/j for i, j in zip(LISA, distances)], color="blue", label="$\sigma_{LISA}/d_L$")
-    plt.plot(line, [i/j for i, j in zip(v, distances)], color="orange", label="$\sigma_v/d_L$")
-    plt.plot(line, [i/j for i, j in zip(lens, distances)], linestyle="dotted", color="red", label="$\sigma_{lens}/d_L$")
-    plt.plot(line, [i/j for i, j in zip(delens, distances)], color="red", label="$\sigma_{delens}/d_L$")
+    plt.plot(line, total/distances, linestyle="dashed", color="black" ,label="$\sigma/d_L$")
+    plt.plot(line, photo/distances, color="green", label="$\sigma_{photo}/d_L$")
+    plt.plot(line, LISA/distances, color="blue", label="$\sigma_{LISA}/d_L$")
+    plt.plot(line, v/distances, color="orange", label="$\sigma_v/d_L$")
+    plt.plot(line, lens/distances, linestyle="dotted", color="red", label="$\sigma_{lens}/d_L$")
+    plt.plot(line, delens/distances, color="red", label="$\sigma_{delens}/d_L$")
 
     # fancy up the plot
     plt.title("Reproducing figure 3 from arXiv:2010.09049")
@@ -199,6 +201,7 @@ def plot_error(output=None):
     # output or show
     if output:
         plt.savefig(output, transparent=True)
+        plt.close()
     else:
         plt.show()
 
@@ -13,13 +13,30 @@ from gwcatalog.LIGO import plot_dist as LIGO_dist
 from gwcatalog.LIGO import plot_error as LIGO_error
 
 # IO functions to save and load catalogs
-from gwcatalog.IO import save, load
+from gwcatalog.IO import save, load, load_metadata, load_redshifts
+
+# extend existing catalogs
+from gwcatalog.extend import extend, metadata
+
+# generate long catalogs with checkpoints
+from gwcatalog.checkpoint import resumable
+from gwcatalog.checkpoint import clean as clean_checkpoint
 
 # plot catalogs
 from gwcatalog.plot import plot
 
+# render all debug figures to files
+from gwcatalog.plot import debug
+
 # give access to the underlying cosmology
 from gwcatalog.cosmology import H, dL
 
+# generation context (cosmology, random number generators and settings)
+from gwcatalog.context import Context
+from gwcatalog.context import load as load_cosmology
+
+# run several generations concurrently
+from gwcatalog.batch import batch
+
 # version
 __version__ = "0.0.0"
@@ -4,45 +4,102 @@
 
 # imports
 from scipy.optimize import fsolve
-from random import uniform, gauss
+from scipy.misc import derivative
+from scipy.special import ndtr, ndtri
 import numpy as np
-import sys
-import os
 
 # local imports
-from .cosmology import H, dL
+from .cache import Table
 
 
 # get N randomly generated events from a given distribution, using rejection
-def GetRandom(distribution, x_min, x_max, y_min, y_max, N=1):
-    counter = 0
+# the candidates are drawn and tested in vectorized blocks, but the random numbers are consumed exactly as if they were drawn one (x, y) pair at a time
+# the generator is left right after the last accepted candidate, hence consecutive calls continue the same stream as a single call
+def GetRandom(distribution, x_min, x_max, y_min, y_max, rng, N=1):
     events = []
 
-    while counter < N:
-        x = uniform(x_min, x_max)
-        y = uniform(y_min, y_max)
+    while len(events) < N:
+        missing = N - len(events)
 
-        if y < distribution(x):
-            events.append(x)
-            counter += 1
+        # draw a block of candidates, large enough to usually get all the missing events at once
+        state = rng.bit_generator.state
+        uniform = rng.random((min(max(4*missing, 1024), 10**6), 2))
+        x = x_min + (x_max - x_min)*uniform[:, 0]
+        y = y_min + (y_max - y_min)*uniform[:, 1]
+
+        accepted = np.flatnonzero(y < distribution(x))
+
+        # rewind the generator and only consume the candidates up to the last event needed
+        if len(accepted) >= missing:
+            accepted = accepted[:missing]
+            rng.bit_generator.state = state
+            rng.random((accepted[-1] + 1, 2))
+
+        events.extend(x[accepted].tolist())
 
     return events
 
 
 # get the theoretical line for luminosity distance
-def dL_line(zmin, zmax, N=1000):
+def dL_line(zmin, zmax, H, dL, N=1000):
     # protection against invalid arguments
     if (zmin < 0 or zmax < 0) or (zmax < zmin):
         raise Exception("Please specify a valid redshifts interval.")
 
     # create a "solid line" and compute distances for that line
     line = np.linspace(zmin, zmax, N)
-    distances = [dL(i, H) for i in line]
+    distances = dL_array(line, H, dL).tolist()
 
     return line, distances
 
-# convert luminosity distance to redshift
-def dL_to_redshift(distance, z0=0):
+
+# get the luminosity distance for a redshift or an array of redshifts, all at once if they are tabulated
+def dL_array(z, H, dL):
+    if isinstance(dL, Table) and H is dL.H:
+        return dL.distance(z)
+
+    if np.ndim(z) == 0:
+        return dL(z, H)
+
+    return np.array([dL(i, H) for i in z])
+
+
+# get the Hubble function for a redshift or an array of redshifts, all at once if H(z) accepts NumPy arrays
+# falls back to evaluating it point by point, for cosmological models written with the functions from math
+def H_array(z, H):
+    if np.ndim(z) == 0:
+        return H(z)
+
+    z = np.asarray(z, dtype=float)
+    try:
+        return np.broadcast_to(np.asarray(H(z), dtype=float), z.shape)
+    except (TypeError, ValueError):
+        return np.array([H(i) for i in z.ravel()], dtype=float).reshape(z.shape)
+
+
+# get the derivative of the luminosity distance with respect to the redshift, all at once if they are tabulated
+def dL_derivative(z, H, dL):
+    if isinstance(dL, Table) and H is dL.H:
+        return dL.derivative(z)
+
+    if np.ndim(z) == 0:
+        return derivative(dL, z, dx=1e-6, args=(H,))
+
+    return np.array([derivative(dL, i, dx=1e-6, args=(H,)) for i in z])
+
+
+# convert luminosity distance to redshift, for a distance or an array of distances
+def dL_to_redshift(distance, H, dL, z0=0):
+    # invert the distance table directly, if available
+    if isinstance(dL, Table) and H is dL.H:
+        redshift = dL.redshift(distance)
+        if redshift is not None:
+            return redshift
+
+    # solve for each distance, for an array of distances
+    if np.ndim(distance) > 0:
+        return np.array([dL_to_redshift(i, H, dL, z0=z0) for i in distance])
+
     # auxiliary function to solve using scipy
     def func(z, distance, H):
         return distance - dL(z, H)
@@ -53,12 +110,49 @@ def dL_to_redshift(distance, z0=0):
     return redshift
 
 
-# distribute the events around the most likely value using a gaussian distribution, with protection against negative values
-def distribute(distances, errors):
-    for i in range(0, len(distances)):
-        newdistance = -1
-        while newdistance < 0:
-            newdistance = gauss(distances[i], errors[i])
-        distances[i] = newdistance
+# distribute the events around the most likely value using a gaussian distribution truncated at zero, to protect against negative values
+# sampled by inverting its cumulative distribution function, which takes exactly one random number per event and in order
+# hence generating the events all at once or in consecutive chunks gives exactly the same result
+def distribute(distances, errors, rng):
+    distances = np.asarray(distances, dtype=float)
+    errors = np.asarray(errors, dtype=float)
+
+    # events without error are kept at their most likely value
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # probability of a negative distance for each event, which is excluded from the distribution
+        lower = ndtr(-distances/errors)
+
+        # invert the cumulative distribution function of each event for a uniform random number
+        uniform = lower + rng.random(len(distances))*(1 - lower)
+        newdistances = np.where(errors > 0, np.maximum(distances + errors*ndtri(uniform), 0), distances)
+
+    return newdistances, errors
+
+
+# check that the redshifts provided by the user are within the survey limits, reporting all of those that are not
+def check_redshifts(redshifts, zmin, zmax, survey):
+    outside = np.flatnonzero(~((redshifts >= zmin) & (redshifts <= zmax)))
+
+    if len(outside) > 0:
+        listed = ", ".join(f"z[{i}] = {redshifts[i]}" for i in outside[:10])
+        if len(outside) > 10:
+            listed += f" and {len(outside) - 10} more"
+        raise Exception(f"{len(outside)} redshift(s) out of bounds: {listed}. Lowest and highest redshift for {survey} are z={zmin} and z={zmax} correspondingly")
+
+    return
+
+
+# evaluate functions of the redshift (e.g.: the luminosity distance and its error) once for each unique redshift, in a single vectorized pass
+# the results are returned in the same order as the provided redshifts
+def evaluate_unique(functions, redshifts):
+    unique, inverse = np.unique(redshifts, return_inverse=True)
+
+    return [np.asarray(function(unique), dtype=float)[inverse] for function in functions]
+
+
+# return the catalog as lists, unless the redshifts were provided by the user as a NumPy array
+def catalog(provided, redshifts, distances, errors):
+    if isinstance(provided, np.ndarray):
+        return np.asarray(redshifts, dtype=float), np.asarray(distances, dtype=float), np.asarray(errors, dtype=float)
 
-    return distances, errors
+    return list(redshifts), np.asarray(distances, dtype=float).tolist(), np.asarray(errors, dtype=float).tolist()
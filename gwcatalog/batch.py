@@ -0,0 +1,17 @@
+## batch.py
+# run several independent generations concurrently in the same process
+
+
+# imports
+from concurrent.futures import ThreadPoolExecutor
+
+
+# run a batch of jobs in a pool of threads and return their results in the same order
+# each job is a (function, kwargs) pair, e.g.: (gwc.ET, {"events": 1000, "context": gwc.Context(seed=1)})
+# each job must be given its own context, since contexts are not meant to be shared between threads
+def batch(jobs, workers=None):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(function, **kwargs) for function, kwargs in jobs]
+        results = [future.result() for future in futures]
+
+    return results
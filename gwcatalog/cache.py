@@ -0,0 +1,139 @@
+## cache.py
+# persistent on-disk cache of luminosity distance tables, shared between processes
+
+
+# imports
+from scipy.interpolate import CubicHermiteSpline
+from hashlib import sha256
+import numpy as np
+import threading
+import tempfile
+import os
+
+
+# redshift grid of the tables, changing it (or the table layout) requires bumping the version
+version = 1
+zmax = 10
+points = 10001
+
+
+# directory where the tables are stored, can be changed with the GWCATALOG_CACHE environment variable
+def directory():
+    if "GWCATALOG_CACHE" in os.environ:
+        return os.environ["GWCATALOG_CACHE"]
+
+    cache = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+
+    return os.path.join(cache, "gwcatalog")
+
+
+# content addressed key of a cosmological model, from the source code that defines it
+def key(source):
+    if isinstance(source, str):
+        source = source.encode()
+
+    header = f"gwcatalog distance table v{version}, z = [0, {zmax}], {points} points\n".encode()
+
+    return sha256(header + source).hexdigest()
+
+
+# luminosity distance of a cosmological model, interpolated from a table of z, dL(z) and dD/dz
+# behaves like dL(z, H), falling back to the provided function outside the table or for a different H
+class Table:
+    def __init__(self, H, dL, key=None):
+        self.H = H
+        self.dL = dL
+        self.key = key
+        self.lock = threading.Lock()
+        self.splines = None
+
+    # same signature as dL(z, H), so it can replace the luminosity distance anywhere
+    def __call__(self, z, H):
+        if H is not self.H or self.key is None:
+            return self.dL(z, H)
+
+        return self.distance(z)
+
+    # check if the provided redshifts are covered by the table
+    def covers(self, z):
+        z = np.asarray(z, dtype=float)
+        return self.key is not None and bool(np.all((z >= 0) & (z <= zmax)))
+
+    # luminosity distance for a redshift or an array of redshifts
+    def distance(self, z):
+        if not self.covers(z):
+            return self.fallback(self.dL, z)
+
+        distances = self.load()[0](z)
+        return float(distances) if np.ndim(distances) == 0 else distances
+
+    # derivative of the luminosity distance with respect to the redshift
+    def derivative(self, z):
+        if not self.covers(z):
+            return self.fallback(lambda Z, H: (self.dL(Z + 1e-6, H) - self.dL(Z - 1e-6, H))/2e-6, z)
+
+        derivatives = self.load()[0](z, 1)
+        return float(derivatives) if np.ndim(derivatives) == 0 else derivatives
+
+    # redshift for a luminosity distance or an array of luminosity distances, None if outside of the table
+    def redshift(self, distance):
+        if self.key is None:
+            return None
+
+        inverse = self.load()[1]
+        distance = np.asarray(distance, dtype=float)
+        if np.any(distance < inverse.x[0]) or np.any(distance > inverse.x[-1]):
+            return None
+
+        redshifts = inverse(distance)
+        return float(redshifts) if np.ndim(redshifts) == 0 else redshifts
+
+    # evaluate the luminosity distance point by point, for redshifts outside of the table
+    def fallback(self, function, z):
+        if np.ndim(z) == 0:
+            return function(z, self.H)
+
+        return np.array([function(i, self.H) for i in np.asarray(z, dtype=float).ravel()]).reshape(np.shape(z))
+
+    # get the interpolators, reading the table from disk or computing and storing it on first use
+    def load(self):
+        with self.lock:
+            if self.splines is None:
+                z, distances, derivatives = self.read()
+                self.splines = (CubicHermiteSpline(z, distances, derivatives), CubicHermiteSpline(distances, z, 1/derivatives))
+
+        return self.splines
+
+    # memory map the table from disk, computing it if it does not exist yet
+    def read(self):
+        path = os.path.join(directory(), self.key + ".npy")
+
+        try:
+            return np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            pass
+
+        table = self.compute()
+
+        # write to a temporary file and rename it, so that concurrent readers never see a partial table
+        try:
+            os.makedirs(directory(), exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=directory(), suffix=".npy.tmp", delete=False) as file:
+                np.save(file, table)
+                file.flush()
+                os.fsync(file.fileno())
+            os.chmod(file.name, 0o644)
+            os.replace(file.name, path)
+        except OSError:
+            # read-only or unavailable cache, keep the table in memory
+            return table
+
+        return np.load(path, mmap_mode="r")
+
+    # compute the table by evaluating the luminosity distance in a fine grid of redshifts
+    def compute(self):
+        z = np.linspace(0, zmax, points)
+        distances = np.array([self.dL(i, self.H) for i in z])
+        derivatives = np.gradient(distances, z, edge_order=2)
+
+        return np.array([z, distances, derivatives])
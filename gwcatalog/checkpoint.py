@@ -0,0 +1,123 @@
+## checkpoint.py
+# functions to generate long forecast catalogs in chunks, which can be resumed if interrupted
+
+
+# imports
+import numpy as np
+import tempfile
+import glob
+import json
+import os
+
+# local imports
+from .context import Context
+from .LISA import generate as LISA, dist as LISA_dist
+from .ET import generate as ET
+from .LIGO import generate as LIGO
+
+
+# write a file atomically, by writing to a temporary file in the same directory and renaming it
+def write(filename, save):
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(filename), prefix="partial-", suffix=".tmp", delete=False) as file:
+        save(file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(file.name, filename)
+
+    return
+
+
+# generate a forecast catalog in chunks of events, storing each completed chunk and the state of the random streams in a checkpoint directory
+# if resume is set and the checkpoint exists, the generation continues where it stopped
+# since events are generated one after the other, the result is identical to generating the whole catalog at once with the same seed
+def resumable(survey, directory, population=None, events=0, years=0, ideal=False, context=None, resume=False, chunk=10000):
+    # protection against invalid catalog types
+    if survey not in ["LISA", "ET", "LIGO"]:
+        raise Exception("Only forecast catalogs (LISA, ET or LIGO) can be generated with checkpoints")
+
+    # specify either events or years
+    if bool(events) + bool(years) != 1:
+        raise Exception("Specify either the number of events or years")
+    if years and survey != "LISA":
+        raise Exception("The mission lifetime in years can only be provided for LISA catalogs")
+
+    # protection against chunks which would never complete the catalog
+    if chunk <= 0:
+        raise Exception("The number of events in each chunk must be positive")
+
+    # get the total number of events
+    N = int(LISA_dist(population)[5] * years/5) if years else events
+
+    # parameters of the generation, which must match when resuming
+    context = context if context else Context()
+    job = {"survey": survey, "population": population, "events": events, "years": years, "ideal": ideal, "chunk": chunk, "cosmology": context.description, "key": context.key}
+
+    # get the completed chunks and continue the random streams from the checkpoint, if it exists
+    statefile = os.path.join(directory, "state.json")
+    chunks = []
+    if os.path.exists(statefile):
+        if not resume:
+            raise Exception(f"A checkpoint already exists in {directory}, resume it or remove it to start again")
+
+        with open(statefile, "r") as file:
+            state = json.load(file)
+        if state["job"] != job:
+            raise Exception(f"The checkpoint in {directory} belongs to a different catalog: {state['job']}")
+
+        context.restore(state["context"])
+        chunks = [np.load(os.path.join(directory, f"chunk-{i:06d}.npy")) for i in range(0, state["chunks"])]
+        created = state.get("created", False)
+    else:
+        # protection against mixing the checkpoint with other files, which would be removed along with it
+        if os.path.isdir(directory) and os.listdir(directory):
+            raise Exception(f"The directory {directory} is not empty and does not contain a checkpoint, provide a new or empty directory")
+
+        # remember if the directory was created for the checkpoint, so that it is only removed in that case
+        created = not os.path.isdir(directory)
+        os.makedirs(directory, exist_ok=True)
+        write(statefile, lambda file: file.write(json.dumps({"job": job, "chunks": 0, "created": created, "context": context.state()}).encode()))
+
+    # generate the missing chunks, storing each one before updating the state
+    done = sum(len(i[0]) for i in chunks)
+    while done < N:
+        n = min(chunk, N - done)
+
+        if survey == "LISA":
+            catalog = LISA(population=population, events=n, ideal=ideal, context=context)
+        elif survey == "ET":
+            catalog = ET(events=n, ideal=ideal, context=context)
+        elif survey == "LIGO":
+            catalog = LIGO(events=n, ideal=ideal, context=context)
+
+        chunks.append(np.array(catalog, dtype=float))
+        done += n
+
+        write(os.path.join(directory, f"chunk-{len(chunks) - 1:06d}.npy"), lambda file: np.save(file, chunks[-1]))
+        write(statefile, lambda file: file.write(json.dumps({"job": job, "chunks": len(chunks), "created": created, "context": context.state()}).encode()))
+
+    # join all chunks into a single catalog
+    table = np.concatenate(chunks, axis=1) if chunks else np.zeros((3, 0))
+
+    return table[0].tolist(), table[1].tolist(), table[2].tolist()
+
+
+# remove a checkpoint once it is no longer needed, deleting only the files written by it
+# the directory itself is only removed if it was created for the checkpoint and nothing else was added to it
+def clean(directory):
+    statefile = os.path.join(directory, "state.json")
+
+    # protection against removing something that is not a checkpoint
+    if not os.path.exists(statefile):
+        raise Exception(f"There is no checkpoint in {directory}")
+
+    with open(statefile, "r") as file:
+        created = json.load(file).get("created", False)
+
+    for filename in glob.glob(os.path.join(directory, "chunk-*.npy")) + glob.glob(os.path.join(directory, "partial-*.tmp")):
+        os.remove(filename)
+    os.remove(statefile)
+
+    if created and not os.listdir(directory):
+        os.rmdir(directory)
+
+    return
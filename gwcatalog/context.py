@@ -0,0 +1,85 @@
+## context.py
+# generation context, holding the cosmological model, the random number generators and the settings used to generate a catalog
+
+
+# imports
+from importlib.util import spec_from_file_location, module_from_spec
+import numpy as np
+
+# local imports
+from .cache import Table, key
+from . import cosmology
+
+
+# everything a generator depends on, passed explicitly so that independent generations never share any state
+# a context must not be shared between threads, create one for each concurrent generation instead
+# for custom cosmologies, the luminosity distance is only tabulated if a source (e.g.: the script defining them) is provided
+class Context:
+    def __init__(self, H=None, dL=None, description=None, seed=None, source=None):
+        # protection against an incomplete cosmological model
+        if (H is None) != (dL is None):
+            raise Exception("Specify both the Hubble function H(z) and the luminosity distance dL(z, H), or neither to use the default cosmology")
+
+        # cosmological model, defaults to the one in cosmology.py
+        if H is None:
+            self.H = cosmology.H
+            self.dL = cosmology.dL
+            self.description = description if description else cosmology.description
+        else:
+            self.H = H
+            self.dL = Table(H, dL, key(source)) if source else dL
+            self.description = description if description else "custom"
+
+        # key identifying the cosmological model, None if it is not tabulated
+        self.key = self.dL.key if isinstance(self.dL, Table) else None
+
+        # random number generators, one to sample the events and another to distribute them around the theoretical value
+        # using independent streams ensures that the same seed yields the same redshifts, regardless of the ideal flag
+        sequence = np.random.SeedSequence(seed)
+        self.seed = sequence.entropy
+        self.seeded = seed is not None
+        sampling, scatter = sequence.spawn(2)
+        self.sampling = np.random.default_rng(sampling)
+        self.scatter = np.random.default_rng(scatter)
+
+    # current state of the context, which can be stored (e.g.: in a catalog header) to continue the random streams later
+    def state(self):
+        return {
+            "cosmology": self.description,
+            "key": self.key,
+            "seed": self.seed,
+            "sampling": self.sampling.bit_generator.state,
+            "scatter": self.scatter.bit_generator.state,
+        }
+
+    # continue the random streams from a previously stored state, which must have been created with the same cosmology
+    # and with the same seed, if one was provided
+    def restore(self, state):
+        if state["key"] != self.key or state["cosmology"] != self.description:
+            raise Exception(f"The stored state was created with a different cosmological model ({state['cosmology']}), provide the same cosmology to continue it")
+        if self.seeded and state["seed"] != self.seed:
+            raise Exception(f"The stored state was created with a different seed ({state['seed']}), provide the same seed or none to continue it")
+
+        self.seed = state["seed"]
+        self.sampling.bit_generator.state = state["sampling"]
+        self.scatter.bit_generator.state = state["scatter"]
+
+
+# create a context from a Python script which defines a custom cosmology
+def load(filename, seed=None):
+    # read the source, which identifies the cosmological model in the distance table cache
+    with open(filename, "r") as file:
+        source = file.read()
+
+    # import the script as a standalone module, without touching sys.path or sys.modules
+    spec = spec_from_file_location("gwcatalog_cosmology", filename)
+    module = module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    # the description of the cosmological model is optional
+    try:
+        description = module.description.replace("\n", "")
+    except AttributeError:
+        description = "custom"
+
+    return Context(H=module.H, dL=module.dL, description=description, seed=seed, source=source)
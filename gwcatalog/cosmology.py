@@ -5,6 +5,13 @@
 # imports
 from scipy.integrate import quad
 
+# local imports
+from .cache import Table, key
+
+
+# descriptive name of the cosmological model, printed in the header of the generated catalogs
+description = "ΛCDM (Ωₘ = 0.284, h = 0.7)"
+
 
 # Hubble function
 def H(z):
@@ -25,7 +32,12 @@ def H(z):
     return H0*(Ωm*(1+z)**3 + 1-Ωm)**0.5
 
 
-# luminosity distance
-def dL(z, H):
+# luminosity distance, by numerical integration
+def integrate(z, H):
     c = 9.715611890800001e-18  # speed of light [Gpc/s]
     return (1+z) * c * quad(lambda Z: 1/H(Z), 0, z)[0]
+
+
+# luminosity distance, interpolated from a table which is cached on disk and keyed by the source of this file
+with open(__file__, "r") as file:
+    dL = Table(H, integrate, key(file.read()))
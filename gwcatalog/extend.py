@@ -0,0 +1,76 @@
+## extend.py
+# functions to extend an existing catalog with new events, without generating it again
+
+
+# local imports
+from .IO import load, load_metadata
+from .context import Context
+from .LISA import generate as LISA, dist as LISA_dist
+from .ET import generate as ET
+from .LIGO import generate as LIGO
+
+
+# metadata of a catalog generated from the underlying distributions, to store in its header with save
+# must be created right after generating the catalog, so that it holds the final state of the random streams
+def metadata(survey, context, population=None, events=0, years=0, ideal=False):
+    return {
+        "survey": survey,
+        "population": population,
+        "events": events,
+        "years": years,
+        "ideal": ideal,
+        **context.state(),
+    }
+
+
+# extend a catalog, which was saved with metadata, to the provided total number of events or years
+# the random streams continue where they stopped, so the result is the same as generating the larger catalog at once
+# returns the redshifts, distances and errors of the whole catalog, along with its updated metadata
+def extend(filename, events=0, years=0, context=None):
+    # get the existing catalog and its metadata
+    redshifts, distances, errors = load(filename)
+    stored = load_metadata(filename)
+
+    # protection against catalogs which can not be extended
+    if not stored:
+        raise Exception("The catalog has no metadata in its header, only catalogs saved with metadata can be extended")
+    if stored["survey"] not in ["LISA", "ET", "LIGO"] or not (stored["events"] or stored["years"]):
+        raise Exception("Only forecast catalogs generated from the underlying distributions (LISA, ET or LIGO) can be extended")
+
+    # specify either events or years
+    if bool(events) + bool(years) != 1:
+        raise Exception("Specify either the total number of events or years")
+    if years and stored["survey"] != "LISA":
+        raise Exception("The mission lifetime in years can only be provided for LISA catalogs")
+
+    # continue the random streams of the catalog, which requires the same cosmology
+    context = context if context else Context()
+    context.restore(stored)
+
+    # get the number of events that are missing
+    if years:
+        N = int(LISA_dist(stored["population"])[5] * years/5)
+    else:
+        N = events
+    new = N - len(redshifts)
+
+    if new < 0:
+        raise Exception(f"The catalog already has {len(redshifts)} events, more than the requested {N}")
+
+    # generate and append only the missing events
+    if new > 0:
+        if stored["survey"] == "LISA":
+            catalog = LISA(population=stored["population"], events=new, ideal=stored["ideal"], context=context)
+        elif stored["survey"] == "ET":
+            catalog = ET(events=new, ideal=stored["ideal"], context=context)
+        elif stored["survey"] == "LIGO":
+            catalog = LIGO(events=new, ideal=stored["ideal"], context=context)
+
+        redshifts += catalog[0]
+        distances += catalog[1]
+        errors += catalog[2]
+
+    # update the metadata with the new size and the state of the random streams
+    updated = metadata(stored["survey"], context, population=stored["population"], events=0 if years else events, years=years, ideal=stored["ideal"])
+
+    return redshifts, distances, errors, updated
@@ -3,13 +3,18 @@
 
 # imports
 import matplotlib.pyplot as plt
+import os
 
 # local imports
 from .auxiliary import dL_line
+from .context import Context
+from .LISA import plot_dist as LISA_dist, plot_error as LISA_error
+from .ET import plot_dist as ET_dist, plot_error as ET_error
+from .LIGO import plot_dist as LIGO_dist, plot_error as LIGO_error
 
 
 # plot a given mock catalog [redshifts:list, distances:list, errors:list, label:str]
-def plot(*args, theoretical=None, output=None):
+def plot(*args, theoretical=None, output=None, context=None):
     # custom colors that match the ones i use in getdist
     colors = ["#006FED", "#E03424", "#008000", "#9c5500", "#9224e0", "#ed00e6", "#f2e400", "#00f2e4", "#6fd95f"]
 
@@ -36,7 +41,9 @@ def plot(*args, theoretical=None, output=None):
 
     # plot luminosity distance theoretical line
     if theoretical:
-        line, distances = dL_line(0, zmax*1.05)
+        # get the cosmological model, defaults to a new context
+        context = context if context else Context()
+        line, distances = dL_line(0, zmax*1.05, context.H, context.dL)
         if type(theoretical) == str:
             label = theoretical
         else:
@@ -52,5 +59,34 @@ def plot(*args, theoretical=None, output=None):
     # output or show
     if output:
         plt.savefig(output, transparent=True)
+        plt.close()
     else:
         plt.show()
+
+
+# render every diagnostic figure, for all surveys and populations, to files in the provided directory
+def debug(directory=".", extension="png", context=None):
+    # get the cosmological model, defaults to a new context
+    context = context if context else Context()
+
+    # create the output directory, if needed
+    os.makedirs(directory, exist_ok=True)
+
+    # all diagnostic figures, the distributions for LISA include all of the MBHB populations
+    figures = {
+        "LISA_distribution": lambda output: LISA_dist(output=output),
+        "LISA_error": lambda output: LISA_error(output=output, context=context),
+        "ET_distribution": lambda output: ET_dist(output=output, context=context),
+        "ET_error": lambda output: ET_error(output=output, context=context),
+        "LIGO_distribution": lambda output: LIGO_dist(output=output),
+        "LIGO_error": lambda output: LIGO_error(output=output, context=context),
+    }
+
+    # render each figure to its own file
+    outputs = []
+    for name, figure in figures.items():
+        output = os.path.join(directory, f"{name}.{extension}")
+        figure(output)
+        outputs.append(output)
+
+    return outputs